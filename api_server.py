@@ -0,0 +1,289 @@
+import json
+import math
+import numbers
+import queue
+import logging
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import config
+
+# Log settings
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('api_server')
+
+# Indicator columns exposed per (symbol, interval)
+_COLUMNS = ('close', 'fisher', 'trigger', 'ema_fish', 'upper_band', 'lower_band')
+_SIGNAL_FIELDS = ('type', 'strength', 'price', 'trigger', 'band', 'fisher', 'time')
+
+class _Snapshot:
+    """
+    Immutable view of the latest scan results, with pre-serialized responses
+    """
+
+    def __init__(self, version: int, entries: Dict[str, Dict[str, Any]], entry_versions: Dict[str, int]):
+        self.version = version
+        self.entries = entries
+        self.entry_versions = entry_versions
+        self.entry_bodies = {key: json.dumps(entry).encode() for key, entry in entries.items()}
+        self.bulk_body = b'[' + b','.join(self.entry_bodies.values()) + b']'
+        self.signals_body = json.dumps([
+            {'symbol': entry['symbol'], 'interval': entry['interval'], **signal}
+            for entry in entries.values() for signal in entry['signals']
+        ]).encode()
+
+# Current snapshot; replaced (never modified) after each scan
+_snapshot = _Snapshot(0, {}, {})
+# Results recorded since the last publish
+_pending: Dict[str, Dict[str, Any]] = {}
+_pending_lock = threading.Lock()
+# Server-sent-events subscribers
+_subscribers: List[queue.Queue] = []
+_subscribers_lock = threading.Lock()
+_server: Optional[ThreadingHTTPServer] = None
+# Makes ETags unique across restarts
+_BOOT_ID = format(int(time.time()), 'x')
+
+def _json_value(value: Any) -> Any:
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        return value if math.isfinite(value) else None
+    return value
+
+def record_result(symbol: str, interval: str, latest: Any, signals: List[Dict[str, Any]]) -> None:
+    """
+    Records the latest indicator values and signals of a pair for the next publish
+
+    Args:
+        symbol: Trading pair symbol
+        interval: Time interval
+        latest: Last row of the fisher_ema_band result
+        signals: Signals detected on that row
+    """
+    if _server is None:
+        return
+
+    now = datetime.now().isoformat(timespec='seconds')
+    entry = {
+        'symbol': symbol,
+        'interval': interval,
+        'time': _json_value(latest.name),
+        'computed_at': now,
+        'checked_at': now,
+        'stale': False,
+        'signals': [{field: _json_value(s.get(field)) for field in _SIGNAL_FIELDS} for s in signals],
+    }
+    for column in _COLUMNS:
+        entry[column] = _json_value(latest.get(column))
+
+    with _pending_lock:
+        _pending[f"{symbol}/{interval}"] = entry
+
+def mark_checked(symbol: str, interval: str) -> None:
+    """
+    Marks a pair whose calculation was skipped as checked but stale
+
+    Its values stay those of the last full calculation (computed_at).
+    """
+    if _server is None:
+        return
+
+    key = f"{symbol}/{interval}"
+    with _pending_lock:
+        entry = _pending.get(key) or _snapshot.entries.get(key)
+        if entry is None:
+            return
+        _pending[key] = {**entry, 'checked_at': datetime.now().isoformat(timespec='seconds'), 'stale': True}
+
+def publish() -> None:
+    """
+    Swaps in a new snapshot containing the results recorded since the last publish
+    """
+    global _snapshot
+
+    if _server is None:
+        return
+
+    with _pending_lock:
+        if not _pending:
+            return
+        updates = dict(_pending)
+        _pending.clear()
+        current = _snapshot
+        version = current.version + 1
+        entries = dict(current.entries)
+        entries.update(updates)
+        entry_versions = dict(current.entry_versions)
+        entry_versions.update((key, version) for key in updates)
+        _snapshot = _Snapshot(version, entries, entry_versions)
+
+    # Notify stream subscribers of signals that were not in the previous snapshot
+    events = []
+    for key, entry in updates.items():
+        previous = current.entries.get(key)
+        seen = {(s['type'], s['time']) for s in previous['signals']} if previous else set()
+        for signal in entry['signals']:
+            if (signal['type'], signal['time']) not in seen:
+                events.append(json.dumps({'symbol': entry['symbol'], 'interval': entry['interval'], **signal}))
+    if events:
+        with _subscribers_lock:
+            for subscriber in list(_subscribers):
+                for event in events:
+                    try:
+                        subscriber.put_nowait(event)
+                    except queue.Full:
+                        # Slow client, drop its backlog and disconnect it
+                        _subscribers.remove(subscriber)
+                        with subscriber.mutex:
+                            subscriber.queue.clear()
+                        subscriber.put_nowait(None)
+                        break
+
+    logger.debug(f"Snapshot {version} published: {len(updates)} updates, {len(events)} signals")
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, avoid delayed ACK stalls on keep-alive
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [unquote(p) for p in url.path.split('/') if p]
+        query = parse_qs(url.query)
+        snapshot = _snapshot
+
+        if parts == ['health']:
+            body = json.dumps({'status': 'ok', 'version': snapshot.version, 'pairs': len(snapshot.entries)}).encode()
+            return self._send(200, body)
+
+        if parts == ['indicators']:
+            symbols = set(','.join(query.get('symbols', [])).split(',')) - {''}
+            intervals = set(','.join(query.get('intervals', [])).split(',')) - {''}
+            etag = f'"{_BOOT_ID}-{snapshot.version}"'
+            if self._not_modified(etag):
+                return
+            if not symbols and not intervals:
+                return self._send(200, snapshot.bulk_body, etag)
+            body = b'[' + b','.join(
+                snapshot.entry_bodies[key] for key, entry in snapshot.entries.items()
+                if (not symbols or entry['symbol'] in symbols) and (not intervals or entry['interval'] in intervals)
+            ) + b']'
+            return self._send(200, body, etag)
+
+        if len(parts) == 3 and parts[0] == 'indicators':
+            key = f"{parts[1]}/{parts[2]}"
+            if key not in snapshot.entry_bodies:
+                return self._send(404, b'{"error": "not found"}')
+            etag = f'"{_BOOT_ID}-{snapshot.entry_versions[key]}"'
+            if self._not_modified(etag):
+                return
+            return self._send(200, snapshot.entry_bodies[key], etag)
+
+        if parts == ['signals']:
+            etag = f'"{_BOOT_ID}-{snapshot.version}"'
+            if self._not_modified(etag):
+                return
+            return self._send(200, snapshot.signals_body, etag)
+
+        if parts == ['stream']:
+            return self._stream()
+
+        return self._send(404, b'{"error": "not found"}')
+
+    def _not_modified(self, etag: str) -> bool:
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return True
+        return False
+
+    def _send(self, status: int, body: bytes, etag: str = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self) -> None:
+        subscriber = queue.Queue(maxsize=config.API_STREAM_QUEUE_SIZE)
+        with _subscribers_lock:
+            _subscribers.append(subscriber)
+
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        try:
+            while True:
+                try:
+                    event = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Keep-alive comment, also detects closed connections
+                    self.wfile.write(b': ping\n\n')
+                    self.wfile.flush()
+                    continue
+                if event is None:
+                    break
+                self.wfile.write(b'event: signal\ndata: ' + event.encode() + b'\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with _subscribers_lock:
+                if subscriber in _subscribers:
+                    _subscribers.remove(subscriber)
+
+def start_api_server(host: str = None, port: int = None) -> Optional[ThreadingHTTPServer]:
+    """
+    Starts the read API in a background thread
+
+    Endpoints:
+        GET /health
+        GET /indicators[?symbols=BTC-USDT,ETH-USDT&intervals=5m,15m]
+        GET /indicators/<symbol>/<interval>
+        GET /signals
+        GET /stream (server-sent events of new signals)
+
+    Indicator values are as of the last full calculation (computed_at). When the
+    prefilter skips a pair, its values are kept and marked stale, with checked_at
+    set to the time the pair was last checked.
+
+    Returns:
+        Server instance, None if it could not be started
+    """
+    global _server
+
+    host = config.API_HOST if host is None else host
+    port = config.API_PORT if port is None else port
+    try:
+        server = ThreadingHTTPServer((host, port), _RequestHandler)
+        server.daemon_threads = True
+    except Exception as e:
+        logger.error(f"Error starting API server: {e}")
+        return None
+
+    threading.Thread(target=server.serve_forever, name='api-server', daemon=True).start()
+    _server = server
+    logger.info(f"API server listening on http://{host}:{port}")
+    return server
@@ -26,5 +26,43 @@ FISHER_LENGTH = int(os.environ.get("FISHER_LENGTH", "10"))
 EMA_LENGTH = int(os.environ.get("EMA_LENGTH", "5"))
 RANGE_OFFSET = float(os.environ.get("RANGE_OFFSET", "1.0"))
 
+# Ticker pre-filter: skip candle fetches for pairs that provably cannot cross a band
+PREFILTER_ENABLED = os.environ.get("PREFILTER_ENABLED", "True").lower() == "true"
+PREFILTER_MARGIN = float(os.environ.get("PREFILTER_MARGIN", "0.001"))
+
+# Signal digest: signals from one scan are batched into as few Telegram
+# messages as possible; pending signals are flushed after at most this many seconds
+DIGEST_MAX_WAIT = float(os.environ.get("DIGEST_MAX_WAIT", "20"))
+
+# Profiling (triggered at runtime with SIGUSR1)
+PROFILE_SCANS = int(os.environ.get("PROFILE_SCANS", "3"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "0.005"))
+PROFILE_TRACEMALLOC_FRAMES = int(os.environ.get("PROFILE_TRACEMALLOC_FRAMES", "10"))
+PROFILE_TOP = int(os.environ.get("PROFILE_TOP", "15"))
+
+# Local read API (latest indicator values and signals)
+API_ENABLED = os.environ.get("API_ENABLED", "False").lower() == "true"
+API_HOST = os.environ.get("API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("API_PORT", "8080"))
+API_STREAM_QUEUE_SIZE = int(os.environ.get("API_STREAM_QUEUE_SIZE", "1000"))
+
+# Signal journal (append-only history of detected signals)
+JOURNAL_ENABLED = os.environ.get("JOURNAL_ENABLED", "True").lower() == "true"
+JOURNAL_DIR = os.environ.get("JOURNAL_DIR", "journal")
+JOURNAL_BATCH_SIZE = int(os.environ.get("JOURNAL_BATCH_SIZE", "512"))
+JOURNAL_COMMIT_INTERVAL = float(os.environ.get("JOURNAL_COMMIT_INTERVAL", "1.0"))
+JOURNAL_QUEUE_SIZE = int(os.environ.get("JOURNAL_QUEUE_SIZE", "100000"))
+JOURNAL_REINDEX_THRESHOLD = int(os.environ.get("JOURNAL_REINDEX_THRESHOLD", "50000"))
+
+# Subscriptions and Telegram delivery limits
+SUBSCRIPTIONS_FILE = os.environ.get("SUBSCRIPTIONS_FILE", "subscriptions.json")
+SUBSCRIPTIONS_RELOAD_INTERVAL = float(os.environ.get("SUBSCRIPTIONS_RELOAD_INTERVAL", "5"))
+TELEGRAM_RATE_LIMIT = float(os.environ.get("TELEGRAM_RATE_LIMIT", "25"))
+TELEGRAM_CHAT_INTERVAL = float(os.environ.get("TELEGRAM_CHAT_INTERVAL", "1.0"))
+TELEGRAM_MAX_WORKERS = int(os.environ.get("TELEGRAM_MAX_WORKERS", "8"))
+TELEGRAM_MAX_PENDING_MESSAGES = int(os.environ.get("TELEGRAM_MAX_PENDING_MESSAGES", "10"))
+TELEGRAM_SHUTDOWN_TIMEOUT = float(os.environ.get("TELEGRAM_SHUTDOWN_TIMEOUT", "30"))
+
 # Debug mode
 DEBUG = os.environ.get("DEBUG", "False").lower() == "true"
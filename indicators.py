@@ -77,6 +77,7 @@ def fisher_ema_band(df: pd.DataFrame, length: int = 21, ema_length: int = 50, ra
         lower_band = ema_fish - range_offset
         
         # Update result dataframe
+        result_df['value1'] = nValue1
         result_df['fisher'] = fisher
         result_df['trigger'] = trigger
         result_df['ema_fish'] = ema_fish
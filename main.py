@@ -1,4 +1,6 @@
+import atexit
 import logging
+import signal
 import time
 from datetime import datetime
 import pytz
@@ -9,10 +11,14 @@ import telegram
 import os
 
 import config
-from okx_client import fetch_klines
+import api_server
+from okx_client import fetch_klines, fetch_tickers
 from indicators import fisher_ema_band
 from signal_detector import detect_signals
-from telegram_sender import send_signals, bot, format_signal_message, send_error_message, send_simple_message
+from signal_journal import SignalJournal
+from prefilter import can_skip_fetch, update_band_state
+from profiler import profile_scan, install_signal_handler
+from telegram_sender import send_signals, bot, format_signal_message, send_error_message, send_simple_message, SignalDigest, close_sender
 
 # Logging settings
 logging.basicConfig(
@@ -25,11 +31,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger('main')
 
-def process_symbol_interval(symbol: str, interval: str) -> None:
+# Signal journal, opened at startup when enabled
+journal = None
+
+def process_symbol_interval(symbol: str, interval: str, digest: SignalDigest = None, tickers: dict = None) -> None:
     """
     Executes processing steps for a symbol and time interval
+    
+    If a digest is given, signals are collected into it instead of being sent immediately.
+    If tickers are given, the candle fetch is skipped when no signal is possible.
     """
     try:
+        if tickers is not None and can_skip_fetch(
+            symbol, interval, tickers.get(symbol),
+            length=config.FISHER_LENGTH,
+            ema_length=config.EMA_LENGTH,
+            range_offset=config.RANGE_OFFSET,
+            margin=config.PREFILTER_MARGIN
+        ):
+            logger.debug(f"Skipped, no band cross possible: {symbol} {interval}")
+            api_server.mark_checked(symbol, interval)
+            return
+        
         logger.info(f"İşlem: {symbol} {interval}")
         
         # Fetch kline data
@@ -53,6 +76,15 @@ def process_symbol_interval(symbol: str, interval: str) -> None:
             send_error_message(error_msg, "İndikatör", str(e))
             return
         
+        # Cache band state for the ticker pre-filter
+        if config.PREFILTER_ENABLED:
+            update_band_state(
+                symbol, interval, df_with_indicators,
+                length=config.FISHER_LENGTH,
+                ema_length=config.EMA_LENGTH,
+                range_offset=config.RANGE_OFFSET
+            )
+        
         # Log last values
         latest = df_with_indicators.iloc[-1]
         logger.info(f"Last values [{symbol}-{interval}]: Fisher={latest['fisher']:.4f}, Trigger={latest['trigger']:.4f}")
@@ -66,8 +98,20 @@ def process_symbol_interval(symbol: str, interval: str) -> None:
             send_error_message(error_msg, "Sinyal Tespiti", str(e))
             return
         
+        # Record signals in the journal (queued, never blocks the scan)
+        if journal is not None:
+            for signal in signals:
+                journal.append(signal, symbol, interval)
+        
+        # Expose latest values on the read API
+        api_server.record_result(symbol, interval, latest, signals)
+        
         # 4. Send notification to Telegram (if signals are detected)
-        if signals:
+        if signals and digest is not None:
+            for signal in signals:
+                digest.add(signal, symbol, interval)
+                logger.info(f"Signal queued for digest: {signal['type']} {symbol} {interval}")
+        elif signals:
             # First try direct message
             try:
                 for signal in signals:
@@ -99,23 +143,43 @@ def process_symbol_interval(symbol: str, interval: str) -> None:
         logger.error(error_msg)
         send_error_message(error_msg, "Processing", f"General error: {str(e)}")
 
+@profile_scan
 def run_for_interval(interval: str) -> None:
     """
     Process all symbols for a specific interval
     """
     logger.info(f"===== {interval} SCAN STARTED =====")
-    for symbol in config.SYMBOLS:
-        process_symbol_interval(symbol, interval)
+    digest = SignalDigest()
+    try:
+        for symbol in config.SYMBOLS:
+            process_symbol_interval(symbol, interval, digest)
+    finally:
+        digest.flush()
+        api_server.publish()
     logger.info(f"===== {interval} SCAN COMPLETED =====")
 
+@profile_scan
 def run_all_symbols_all_intervals() -> None:
     """
     Process all symbols and intervals for minute-based scanning
     """
     logger.info("===== MINUTE-BASED SCAN STARTED =====")
-    for symbol in config.SYMBOLS:
-        for interval in config.INTERVALS:
-            process_symbol_interval(symbol, interval)
+    
+    # One ticker request per instrument type instead of one candle request per pair
+    tickers = None
+    if config.PREFILTER_ENABLED:
+        tickers = {}
+        for inst_type in {'SWAP' if symbol.endswith('-SWAP') else 'SPOT' for symbol in config.SYMBOLS}:
+            tickers.update(fetch_tickers(inst_type))
+    
+    digest = SignalDigest()
+    try:
+        for symbol in config.SYMBOLS:
+            for interval in config.INTERVALS:
+                process_symbol_interval(symbol, interval, digest, tickers)
+    finally:
+        digest.flush()
+        api_server.publish()
     logger.info("===== MINUTE-BASED SCAN COMPLETED =====")
 
 def send_startup_notification():
@@ -233,6 +297,12 @@ def schedule_jobs() -> None:
     scheduler.start()
     logger.info("All schedulers started")
 
+def _handle_sigterm(signum, frame):
+    """
+    Runs the same shutdown path as Ctrl+C
+    """
+    raise KeyboardInterrupt
+
 
 if __name__ == "__main__":
     logger.info("Fisher + EMA Band Telegram Bot starting...")
@@ -254,6 +324,21 @@ if __name__ == "__main__":
             # Send startup notification
             send_startup_notification()
             
+            # Open signal journal, committing pending signals on any exit
+            if config.JOURNAL_ENABLED:
+                journal = SignalJournal()
+                atexit.register(journal.close)
+            
+            # Start local read API
+            if config.API_ENABLED:
+                api_server.start_api_server()
+            
+            # Allow on-demand profiling of the next scans (kill -USR1 <pid>)
+            install_signal_handler()
+            
+            # Stop gracefully on SIGTERM (systemd, docker stop) like on Ctrl+C
+            signal.signal(signal.SIGTERM, _handle_sigterm)
+            
             # Create scheduled jobs
             schedule_jobs()
             
@@ -264,6 +349,9 @@ if __name__ == "__main__":
                     time.sleep(1)
             except KeyboardInterrupt:
                 logger.info("Bot stopping...")
+                close_sender()
+                if journal is not None:
+                    journal.close()
                 # Send shutdown message
                 try:
                     send_simple_message("⚠️ Bot stopped! Service is currently unavailable.")
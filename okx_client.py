@@ -3,6 +3,7 @@ import requests
 import logging
 import time
 from datetime import datetime
+from typing import Dict
 import config
 from telegram_sender import send_error_message
 
@@ -86,3 +87,54 @@ def fetch_klines(symbol: str, interval: str, limit: int = 100) -> pd.DataFrame:
         except:
             pass
         return pd.DataFrame()
+
+def fetch_tickers(inst_type: str = "SPOT") -> Dict[str, Dict[str, float]]:
+    """
+    Fetches the latest ticker of every instrument of a type from OKX in one request
+    
+    Args:
+        inst_type: Instrument type (e.g., SPOT, SWAP)
+        
+    Returns:
+        Dictionary of instId -> {'last', 'high24h', 'low24h', 'ts'}, empty on error
+    """
+    try:
+        logger.info(f"Fetching {inst_type} tickers...")
+        
+        # OKX API endpoint
+        url = "https://www.okx.com/api/v5/market/tickers"
+        
+        # Send request
+        response = requests.get(url, params={'instType': inst_type})
+        result = response.json()
+        
+        if result.get('code') != '0':
+            error_msg = f"OKX API Error: {result.get('msg', 'Unknown error')}"
+            logger.error(error_msg)
+            send_error_message(error_msg, "OKX API", f"Code: {result.get('code')}")
+            return {}
+        
+        tickers = {}
+        for item in result.get('data', []):
+            try:
+                tickers[item['instId']] = {
+                    'last': float(item['last']),
+                    'high24h': float(item['high24h']),
+                    'low24h': float(item['low24h']),
+                    'ts': int(item['ts'])
+                }
+            except (KeyError, TypeError, ValueError):
+                # Instruments without trades have empty fields
+                continue
+        
+        logger.info(f"Fetched {len(tickers)} {inst_type} tickers")
+        return tickers
+    
+    except Exception as e:
+        error_msg = f"Error fetching tickers: {e}"
+        logger.error(error_msg)
+        try:
+            send_error_message(error_msg, "Data Fetching", f"{inst_type} tickers: {str(e)}")
+        except:
+            pass
+        return {}
@@ -0,0 +1,277 @@
+import argparse
+import math
+import random
+import re
+import logging
+import sys
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+import pandas as pd
+
+# Log settings
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('prefilter')
+
+# Milliseconds per OKX bar unit
+_UNIT_MS = {
+    'm': 60 * 1000,
+    'H': 60 * 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'D': 24 * 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+}
+_INTERVAL_RE = re.compile(r'^(\d+)([mHhDd])$')
+
+# 24h ticker statistics only bound bars that fit in 24 hours
+_MAX_BAR_MS = 24 * 60 * 60 * 1000
+
+# Cached band state per (symbol, interval), from the last full calculation
+_states: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+def interval_to_ms(interval: str) -> Optional[int]:
+    """
+    Converts an OKX bar (e.g., 5m, 1H) into milliseconds, None if unknown
+    """
+    match = _INTERVAL_RE.match(interval)
+    if not match:
+        return None
+    return int(match.group(1)) * _UNIT_MS[match.group(2)]
+
+def update_band_state(symbol: str, interval: str, df: pd.DataFrame,
+                      length: int, ema_length: int, range_offset: float) -> None:
+    """
+    Caches the indicator state needed to bound the current bar's signal
+
+    Args:
+        symbol: Trading pair symbol
+        interval: Time interval
+        df: DataFrame returned by fisher_ema_band (last row = bar in progress)
+        length, ema_length, range_offset: Parameters used for the calculation
+    """
+    key = (symbol, interval)
+    bar_ms = interval_to_ms(interval)
+
+    required = ('value1', 'fisher', 'ema_fish')
+    if bar_ms is None or bar_ms > _MAX_BAR_MS or len(df) <= length or any(c not in df for c in required):
+        with _lock:
+            _states.pop(key, None)
+        return
+
+    hl2 = ((df['high'] + df['low']) / 2).to_numpy()
+    previous = df.iloc[-2]
+    current = df.iloc[-1]
+    # Completed bars of the rolling window used for the bar in progress
+    window = hl2[-length:-1]
+
+    state = {
+        'bar_open': int(df.index[-1].value // 1_000_000),
+        'bar_ms': bar_ms,
+        'bar_high': float(current['high']),
+        'bar_low': float(current['low']),
+        'window_max': float(window.max()) if len(window) else math.nan,
+        'window_min': float(window.min()) if len(window) else math.nan,
+        'value1': float(previous['value1']),
+        'fisher': float(previous['fisher']),
+        'ema_fish': float(previous['ema_fish']),
+        'params': (length, ema_length, range_offset),
+    }
+
+    if not all(math.isfinite(v) for v in state.values() if isinstance(v, float)):
+        with _lock:
+            _states.pop(key, None)
+        return
+
+    with _lock:
+        _states[key] = state
+
+def _normalize(hl2: float, window_max: float, window_min: float) -> float:
+    # Same normalization as fisher_ema_band, non-decreasing in hl2
+    max_h = max(window_max, hl2)
+    min_l = min(window_min, hl2)
+    if max_h == min_l:
+        return 0.5
+    return (hl2 - min_l) / (max_h - min_l)
+
+def _fisher(raw: float, value1: float, fisher: float) -> float:
+    # Same recursion as fisher_ema_band, non-decreasing in raw
+    v1 = 0.33 * 2 * (raw - 0.5) + 0.67 * value1
+    if v1 > 0.99:
+        v2 = 0.999
+    elif v1 < -0.99:
+        v2 = -0.999
+    else:
+        v2 = v1
+    return 0.5 * math.log((1 + v2) / (1 - v2)) + 0.5 * fisher
+
+def can_skip_fetch(symbol: str, interval: str, ticker: Optional[Dict[str, float]],
+                   length: int, ema_length: int, range_offset: float, margin: float) -> bool:
+    """
+    Checks whether the bar in progress provably cannot produce a signal
+
+    The trigger of the bar in progress is the previous bar's Fisher value, so it is
+    already known. The bands only depend on the bar's HL2, which is bounded by the
+    cached bar high/low, the last price and the 24h high/low of the ticker. Since the
+    Fisher recursion is monotonic in HL2, evaluating both ends gives the range of
+    possible band values.
+
+    Args:
+        symbol: Trading pair symbol
+        interval: Time interval
+        ticker: Ticker from fetch_tickers (None if not available)
+        length, ema_length, range_offset: Indicator parameters
+        margin: Safety margin (Fisher units) added around the bands
+
+    Returns:
+        True only if no signal is possible; False whenever in doubt
+    """
+    if not ticker:
+        return False
+
+    with _lock:
+        state = _states.get((symbol, interval))
+    if state is None or state['params'] != (length, ema_length, range_offset):
+        return False
+
+    # Cached state only describes the bar it was calculated for
+    ts = ticker['ts']
+    if not state['bar_open'] <= ts < state['bar_open'] + state['bar_ms']:
+        return False
+
+    last, high24h, low24h = ticker['last'], ticker['high24h'], ticker['low24h']
+    if not all(math.isfinite(v) and v > 0 for v in (last, high24h, low24h)):
+        return False
+
+    # Possible range of the bar's high and low
+    high_min = max(state['bar_high'], last)
+    low_max = min(state['bar_low'], last)
+    if high24h < high_min or low24h > low_max:
+        return False
+
+    hl2_min = (high_min + low24h) / 2
+    hl2_max = (high24h + low_max) / 2
+
+    fisher_min = _fisher(_normalize(hl2_min, state['window_max'], state['window_min']), state['value1'], state['fisher'])
+    fisher_max = _fisher(_normalize(hl2_max, state['window_max'], state['window_min']), state['value1'], state['fisher'])
+
+    alpha = 2 / (ema_length + 1)
+    lowest_upper_band = alpha * fisher_min + (1 - alpha) * state['ema_fish'] + range_offset
+    highest_lower_band = alpha * fisher_max + (1 - alpha) * state['ema_fish'] - range_offset
+
+    trigger = state['fisher']
+    return highest_lower_band + margin <= trigger <= lowest_upper_band - margin
+
+def _random_pair(rng: random.Random, bar_ms: int, bars: int) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, float]]:
+    # Trending random walk; returns the candles seen by the last full calculation
+    # (bar in progress), the candles after more trades in that bar, and a ticker
+    # consistent with the latter
+    price = rng.uniform(0.01, 50000)
+    drift = rng.uniform(-0.01, 0.01)
+    volatility = rng.uniform(0.001, 0.03)
+    start = 1_700_000_000_000 // bar_ms * bar_ms
+
+    rows = []
+    for _ in range(bars):
+        ticks = [price]
+        for _ in range(rng.randint(1, 20)):
+            ticks.append(ticks[-1] * math.exp(rng.gauss(drift / 10, volatility / 3)))
+        rows.append(ticks)
+        price = ticks[-1]
+
+    # Trades of the last bar so far, then some more
+    seen = rng.randint(1, len(rows[-1]))
+    extra = []
+    for _ in range(rng.randint(0, 20)):
+        price *= math.exp(rng.gauss(drift / 10, volatility / 3))
+        extra.append(price)
+
+    def frame(bars_ticks):
+        index = pd.to_datetime([start + i * bar_ms for i in range(len(bars_ticks))], unit='ms')
+        return pd.DataFrame({
+            'open': [t[0] for t in bars_ticks],
+            'high': [max(t) for t in bars_ticks],
+            'low': [min(t) for t in bars_ticks],
+            'close': [t[-1] for t in bars_ticks],
+            'volume': [1.0] * len(bars_ticks),
+        }, index=index)
+
+    before = frame(rows[:-1] + [rows[-1][:seen]])
+    after = frame(rows[:-1] + [rows[-1] + extra])
+
+    bar_open = start + (bars - 1) * bar_ms
+    ts = bar_open + rng.randrange(bar_ms)
+    # 24h statistics include every bar that overlaps the last 24 hours, sometimes
+    # widened by trades that already left the window
+    window = after[after.index.astype('int64') // 1_000_000 + bar_ms > ts - _MAX_BAR_MS]
+    ticker = {
+        'last': float(after['close'].iloc[-1]),
+        'high24h': float(window['high'].max()) * (1 + rng.choice((0, rng.uniform(0, 0.05)))),
+        'low24h': float(window['low'].min()) * (1 - rng.choice((0, rng.uniform(0, 0.05)))),
+        'ts': ts,
+    }
+    return before, after, ticker
+
+def check(trials: int, seed: int) -> int:
+    """
+    Compares can_skip_fetch against a full recalculation on random price series
+
+    Every skipped pair must have no signal when recalculated with the candles that
+    match the ticker. Run it after changing indicators.py or signal_detector.py.
+
+    Returns:
+        Number of missed signals (0 = prefilter is safe)
+    """
+    from indicators import fisher_ema_band
+    from signal_detector import detect_signals
+
+    rng = random.Random(seed)
+    intervals = ['1m', '5m', '15m', '30m', '1H', '4H']
+    skipped = signalled = missed = 0
+
+    logging.getLogger('indicators').setLevel(logging.WARNING)
+    logging.getLogger('signal_detector').setLevel(logging.WARNING)
+
+    for trial in range(trials):
+        interval = rng.choice(intervals)
+        length = rng.randint(3, 25)
+        ema_length = rng.randint(2, 30)
+        range_offset = rng.uniform(0.1, 2.0)
+        symbol = f"CHECK{trial}-USDT"
+
+        before, after, ticker = _random_pair(rng, interval_to_ms(interval), rng.randint(length + 2, 150))
+        update_band_state(symbol, interval, fisher_ema_band(before, length, ema_length, range_offset),
+                          length, ema_length, range_offset)
+        skip = can_skip_fetch(symbol, interval, ticker, length, ema_length, range_offset, margin=0.0)
+        signals = detect_signals(fisher_ema_band(after, length, ema_length, range_offset))
+        with _lock:
+            _states.pop((symbol, interval), None)
+
+        skipped += skip
+        signalled += bool(signals)
+        if skip and signals:
+            missed += 1
+            logger.error(f"Missed signal: trial {trial}, {interval}, length={length}, "
+                         f"ema_length={ema_length}, range_offset={range_offset:.4f}, {signals[0]['type']}")
+
+    print(f"Trials: {trials}, skipped: {skipped} ({skipped / max(trials, 1):.0%}), "
+          f"with signal: {signalled}, missed signals: {missed}")
+    return missed
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Candle fetch prefilter")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    check_parser = subparsers.add_parser('check', help="Verify the prefilter against full recalculations")
+    check_parser.add_argument('--trials', type=int, default=2000)
+    check_parser.add_argument('--seed', type=int, default=42)
+
+    args = parser.parse_args(argv)
+    if args.command == 'check':
+        return 1 if check(args.trials, args.seed) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Callable
+
+import config
+
+# Log settings
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('profiler')
+
+# Number of upcoming scans to profile (0 = profiling off)
+_remaining_scans = 0
+# Only one scan is profiled at a time, tracemalloc is process-wide
+_profile_lock = threading.Lock()
+_state_lock = threading.Lock()
+# Memory snapshot of the previous profiled scan, used to report growth
+_previous_snapshot = None
+
+def request_profiling(scans: int = None) -> None:
+    """
+    Enables profiling for the next scans
+
+    Args:
+        scans: Number of scans to profile (default: config.PROFILE_SCANS)
+    """
+    global _remaining_scans
+    _remaining_scans = config.PROFILE_SCANS if scans is None else scans
+    logger.info(f"Profiling enabled for the next {_remaining_scans} scans")
+
+def install_signal_handler() -> bool:
+    """
+    Enables profiling when the process receives SIGUSR1 (kill -USR1 <pid>)
+
+    Returns:
+        True if the handler is installed, False if the platform has no SIGUSR1
+    """
+    if not hasattr(signal, 'SIGUSR1'):
+        logger.warning("SIGUSR1 is not available on this platform - Profiling trigger not installed")
+        return False
+
+    signal.signal(signal.SIGUSR1, lambda signum, frame: request_profiling())
+    logger.info(f"Profiling trigger installed: kill -USR1 {os.getpid()}")
+    return True
+
+def profile_scan(func: Callable) -> Callable:
+    """
+    Decorator that profiles a scan function when profiling is requested
+
+    When profiling is off the wrapped function is called directly.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _remaining_scans:
+            return func(*args, **kwargs)
+        return _run_profiled(func, args, kwargs)
+    return wrapper
+
+def _run_profiled(func: Callable, args: tuple, kwargs: dict):
+    global _remaining_scans
+
+    # Another scan is already being profiled, run this one normally
+    if not _profile_lock.acquire(blocking=False):
+        return func(*args, **kwargs)
+
+    try:
+        with _state_lock:
+            requested = _remaining_scans > 0
+            if requested:
+                _remaining_scans -= 1
+            last_scan = _remaining_scans == 0
+        if not requested:
+            return func(*args, **kwargs)
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(config.PROFILE_TRACEMALLOC_FRAMES)
+
+        name = getattr(func, '__name__', 'scan')
+        if args:
+            name += "_" + "_".join(str(arg) for arg in args)
+
+        sampler = _StackSampler(threading.get_ident(), config.PROFILE_SAMPLE_INTERVAL)
+        profiler = cProfile.Profile()
+
+        sampler.start()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            sampler.stop()
+            try:
+                _write_report(name, elapsed, profiler, sampler)
+            except Exception as e:
+                logger.error(f"Error writing profile report: {e}")
+            if last_scan:
+                _stop_memory_tracing()
+    finally:
+        _profile_lock.release()
+
+def _write_report(name: str, elapsed: float, profiler: cProfile.Profile, sampler: '_StackSampler') -> None:
+    global _previous_snapshot
+
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    base = os.path.join(config.PROFILE_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{name}")
+
+    # cProfile statistics (open with `python -m pstats` or snakeviz)
+    profiler.dump_stats(base + ".pstats")
+
+    # Collapsed stacks (input format of flamegraph.pl / speedscope)
+    with open(base + ".collapsed", "w") as f:
+        for stack, count in sampler.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+    logger.info(f"Profile written: {base}.pstats, {base}.collapsed ({elapsed:.2f}s, {sampler.samples} samples)")
+
+    # Slowest functions by cumulative time
+    stats = pstats.Stats(profiler)
+    for (filename, line, func_name), (cc, nc, tt, ct, callers) in sorted(
+            stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:config.PROFILE_TOP]:
+        logger.info(f"CPU {ct:.3f}s cumulative, {tt:.3f}s own, {nc} calls: {func_name} ({os.path.basename(filename)}:{line})")
+
+    # Top allocators and growth since the previous profiled scan
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    for stat in snapshot.statistics('lineno')[:config.PROFILE_TOP]:
+        logger.info(f"Memory {stat.size / 1024:.1f} KiB in {stat.count} blocks: {stat.traceback}")
+    if _previous_snapshot is not None:
+        for stat in snapshot.compare_to(_previous_snapshot, 'lineno')[:config.PROFILE_TOP]:
+            if stat.size_diff > 0:
+                logger.info(f"Memory growth +{stat.size_diff / 1024:.1f} KiB ({stat.count_diff:+d} blocks): {stat.traceback}")
+    _previous_snapshot = snapshot
+
+def _stop_memory_tracing() -> None:
+    global _previous_snapshot
+    tracemalloc.stop()
+    _previous_snapshot = None
+    logger.info("Profiling finished")
+
+class _StackSampler(threading.Thread):
+    """
+    Periodically samples the stack of one thread into collapsed stack counts
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
@@ -0,0 +1,512 @@
+import argparse
+import logging
+import os
+import queue
+import shutil
+import struct
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+import config
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, index builds are then not serialized
+    fcntl = None
+
+# Log settings
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('signal_journal')
+
+# Fixed-size little-endian record:
+# bar time (ms), write time (ms), symbol/interval/type/strength string ids, price, trigger, band, fisher
+_RECORD = struct.Struct('<qqHHHHdddd')
+RECORD_DTYPE = np.dtype([
+    ('time', '<i8'), ('logged', '<i8'),
+    ('symbol', '<u2'), ('interval', '<u2'), ('type', '<u2'), ('strength', '<u2'),
+    ('price', '<f8'), ('trigger', '<f8'), ('band', '<f8'), ('fisher', '<f8'),
+])
+assert RECORD_DTYPE.itemsize == _RECORD.size
+
+DATA_FILE = "signals.bin"
+STRINGS_FILE = "strings.txt"
+INDEX_PREFIX = "index."
+# Held while an index is built, so concurrent builds never interleave
+INDEX_LOCK_FILE = "reindex.lock"
+# Records read on open to restore the last journaled bar per (symbol, interval, type)
+_SEED_RECORDS = 10000
+
+def _time_ms(value: Any) -> int:
+    if hasattr(value, 'value') and isinstance(value.value, (int, np.integer)):
+        # pandas Timestamp (ns)
+        return int(value.value // 1_000_000)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    if isinstance(value, (int, float)):
+        return int(value)
+    return 0
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+def _load_strings(directory: str, repair: bool = False) -> List[str]:
+    path = os.path.join(directory, STRINGS_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as f:
+        data = f.read()
+    # An unterminated last line was never committed
+    complete = data[:data.rfind(b'\n') + 1]
+    if repair and len(complete) != len(data):
+        with open(path, 'r+b') as f:
+            f.truncate(len(complete))
+    return complete.decode('utf-8').splitlines()
+
+class SignalJournal:
+    """
+    Append-only signal journal with a background group-commit writer
+
+    append() only enqueues the signal, so the scan is never blocked by disk I/O.
+    The writer thread collects records for up to JOURNAL_COMMIT_INTERVAL seconds
+    (or JOURNAL_BATCH_SIZE records) and commits them with a single write and fsync.
+    It also rebuilds the query index once more than JOURNAL_REINDEX_THRESHOLD
+    records were appended after it.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = config.JOURNAL_DIR if directory is None else directory
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._strings = _load_strings(self.directory, repair=True)
+        self._string_ids = {s: i for i, s in enumerate(self._strings)}
+
+        # Drop a partially written last record
+        data_path = os.path.join(self.directory, DATA_FILE)
+        if os.path.exists(data_path):
+            size = os.path.getsize(data_path)
+            if size % _RECORD.size:
+                with open(data_path, 'r+b') as f:
+                    f.truncate(size - size % _RECORD.size)
+
+        # Unbuffered, so a failed write leaves no pending bytes behind
+        self._data_file = open(data_path, 'ab', buffering=0)
+        self._strings_file = open(os.path.join(self.directory, STRINGS_FILE), 'ab', buffering=0)
+        # Sizes after the last successful commit
+        self._data_size = os.fstat(self._data_file.fileno()).st_size
+        self._strings_size = os.fstat(self._strings_file.fileno()).st_size
+        self._queue = queue.Queue(maxsize=config.JOURNAL_QUEUE_SIZE)
+        self.dropped = 0
+        self._closed = False
+
+        # Scans re-detect a signal on every run while its bar is open, so only the
+        # first detection per (symbol, interval, type, bar time) is journaled
+        self._last_seen: Dict[tuple, int] = {}
+        self._seen_lock = threading.Lock()
+        self._seed_last_seen(data_path)
+
+        self._reader = JournalReader(self.directory)
+        self._indexed = self._reader.indexed_count()
+
+        self._thread = threading.Thread(target=self._run, name='signal-journal', daemon=True)
+        self._thread.start()
+        logger.info(f"Signal journal opened: {data_path}")
+
+    def append(self, signal: Dict[str, Any], symbol: str, interval: str) -> bool:
+        """
+        Queues a signal for writing without blocking
+
+        Signals already journaled for the same bar are skipped.
+
+        Returns:
+            True if queued or already journaled, False if the queue is full and the signal is dropped
+        """
+        bar_time = _time_ms(signal.get('time'))
+        signal_type = str(signal.get('type', ''))
+        key = (symbol, interval, signal_type)
+        with self._seen_lock:
+            previous = self._last_seen.get(key)
+            if previous == bar_time:
+                return True
+            self._last_seen[key] = bar_time
+
+        item = (
+            bar_time, int(time.time() * 1000),
+            symbol, interval, signal_type, str(signal.get('strength', '')),
+            _float(signal.get('price')), _float(signal.get('trigger')),
+            _float(signal.get('band')), _float(signal.get('fisher')),
+        )
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self._forget(key, bar_time, previous)
+            self.dropped += 1
+            logger.warning(f"Signal journal queue full, signal dropped: {symbol} {interval} (total dropped: {self.dropped})")
+            return False
+
+    def _forget(self, key: tuple, bar_time: int, previous: Optional[int] = None) -> None:
+        # Lets a signal that was not written be journaled on the next detection
+        with self._seen_lock:
+            if self._last_seen.get(key) == bar_time:
+                if previous is None:
+                    del self._last_seen[key]
+                else:
+                    self._last_seen[key] = previous
+
+    def _seed_last_seen(self, data_path: str) -> None:
+        count = self._data_size // _RECORD.size
+        if not count:
+            return
+        records = np.memmap(data_path, dtype=RECORD_DTYPE, mode='r', shape=(count,))[-_SEED_RECORDS:]
+        for record in records:
+            key = (self._strings[record['symbol']], self._strings[record['interval']], self._strings[record['type']])
+            self._last_seen[key] = max(self._last_seen.get(key, int(record['time'])), int(record['time']))
+
+    def close(self) -> None:
+        """
+        Commits pending signals and stops the writer (later calls do nothing)
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._data_file.close()
+        self._strings_file.close()
+
+    def _string_id(self, value: str, new_strings: List[str]) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+            new_strings.append(value)
+        return string_id
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + config.JOURNAL_COMMIT_INTERVAL
+            while len(batch) < config.JOURNAL_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                self._commit(batch)
+            except Exception as e:
+                logger.error(f"Signal journal write error: {e} ({len(batch)} signals lost)")
+                for item in batch:
+                    self._forget((item[2], item[3], item[4]), item[0])
+                continue
+
+            if self._data_size // _RECORD.size - self._indexed > config.JOURNAL_REINDEX_THRESHOLD:
+                try:
+                    self._indexed = self._reader.build_index()
+                except Exception as e:
+                    logger.error(f"Signal journal index error: {e}")
+
+    def _commit(self, batch: List[tuple]) -> None:
+        committed_strings = len(self._strings)
+        new_strings = []
+        records = bytearray()
+        try:
+            for bar_time, logged, symbol, interval, signal_type, strength, price, trigger, band, fisher in batch:
+                records += _RECORD.pack(
+                    bar_time, logged,
+                    self._string_id(symbol, new_strings), self._string_id(interval, new_strings),
+                    self._string_id(signal_type, new_strings), self._string_id(strength, new_strings),
+                    price, trigger, band, fisher
+                )
+
+            # Strings must be durable before the records referring to them
+            if new_strings:
+                strings_data = ''.join(s + '\n' for s in new_strings).encode('utf-8')
+                _write_all(self._strings_file, strings_data)
+                os.fsync(self._strings_file.fileno())
+
+            _write_all(self._data_file, records)
+            os.fsync(self._data_file.fileno())
+        except Exception:
+            self._rollback(committed_strings)
+            raise
+
+        if new_strings:
+            self._strings_size += len(strings_data)
+        self._data_size += len(records)
+        logger.debug(f"Signal journal committed {len(batch)} signals")
+
+    def _rollback(self, committed_strings: int) -> None:
+        # Forget string ids that were not committed and cut both files back to
+        # their committed sizes, so later commits keep line numbers and record
+        # offsets aligned
+        for value in self._strings[committed_strings:]:
+            del self._string_ids[value]
+        del self._strings[committed_strings:]
+        for f, size in ((self._strings_file, self._strings_size), (self._data_file, self._data_size)):
+            try:
+                os.ftruncate(f.fileno(), size)
+            except OSError as e:
+                logger.error(f"Signal journal rollback error: {e}")
+
+def _write_all(f, data: bytes) -> None:
+    # Raw (unbuffered) writes may be partial
+    view = memoryview(data)
+    while view:
+        written = f.write(view)
+        view = view[written:]
+
+class JournalReader:
+    """
+    Indexed queries over a signal journal
+
+    The index sorts record positions by (symbol, interval, type, time) and is stored
+    as memory-mapped .npy files, so a query is a few binary searches. Records
+    appended after the index was built are scanned directly. Queries never write;
+    the index is rebuilt by the journal writer or the reindex command.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = config.JOURNAL_DIR if directory is None else directory
+
+    def _records(self) -> np.ndarray:
+        path = os.path.join(self.directory, DATA_FILE)
+        count = os.path.getsize(path) // RECORD_DTYPE.itemsize if os.path.exists(path) else 0
+        if not count:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+
+    @staticmethod
+    def _keys(records: np.ndarray) -> np.ndarray:
+        return (records['symbol'].astype(np.uint64) << np.uint64(32)) \
+            | (records['interval'].astype(np.uint64) << np.uint64(16)) \
+            | records['type'].astype(np.uint64)
+
+    def _latest_index(self) -> Optional[int]:
+        counts = []
+        for name in os.listdir(self.directory):
+            if name.startswith(INDEX_PREFIX) and name[len(INDEX_PREFIX):].isdigit():
+                counts.append(int(name[len(INDEX_PREFIX):]))
+        return max(counts) if counts else None
+
+    def indexed_count(self) -> int:
+        """
+        Returns the number of records covered by the current index
+        """
+        if not os.path.isdir(self.directory):
+            return 0
+        count = self._latest_index()
+        return 0 if count is None else count
+
+    def _load_index(self) -> Optional[Dict[str, np.ndarray]]:
+        # A rebuild may remove the index between listing and loading it
+        for _ in range(3):
+            count = self._latest_index()
+            if count is None:
+                return None
+            index_dir = os.path.join(self.directory, f"{INDEX_PREFIX}{count}")
+            try:
+                return {
+                    field: np.load(os.path.join(index_dir, f"{field}.npy"), mmap_mode='r')
+                    for field in ('keys', 'times', 'positions', 'unique_keys')
+                }
+            except FileNotFoundError:
+                continue
+        return None
+
+    def build_index(self) -> int:
+        """
+        Rebuilds the index over all committed records
+
+        Builds are serialized with a lock file, and readers keep using the previous
+        index until the new one is renamed into place.
+
+        Returns:
+            Number of indexed records
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, INDEX_LOCK_FILE), 'a') as lock:
+            if fcntl is not None:
+                # Released when the file is closed
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            return self._build_index()
+
+    def _build_index(self) -> int:
+        records = self._records()
+        count = len(records)
+        index_dir = os.path.join(self.directory, f"{INDEX_PREFIX}{count}")
+
+        # Records are append-only, an index of the same size is already up to date
+        if not os.path.isdir(index_dir):
+            keys = self._keys(records)
+            times = np.asarray(records['time'])
+            order = np.lexsort((times, keys))
+
+            tmp_dir = f"{index_dir}.tmp.{os.getpid()}"
+            try:
+                os.makedirs(tmp_dir)
+                np.save(os.path.join(tmp_dir, "keys.npy"), keys[order])
+                np.save(os.path.join(tmp_dir, "times.npy"), times[order])
+                np.save(os.path.join(tmp_dir, "positions.npy"), order.astype(np.int64))
+                np.save(os.path.join(tmp_dir, "unique_keys.npy"), np.unique(keys))
+                os.rename(tmp_dir, index_dir)
+            except Exception:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+
+        # Remove older complete indexes, never another build's temporary directory
+        for name in os.listdir(self.directory):
+            suffix = name[len(INDEX_PREFIX):]
+            if name.startswith(INDEX_PREFIX) and suffix.isdigit() and int(suffix) != count:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+        logger.info(f"Signal journal index built: {count} records")
+        return count
+
+    def query(self, symbol: str = None, interval: str = None, signal_type: str = None,
+              start: datetime = None, end: datetime = None, limit: int = None) -> np.ndarray:
+        """
+        Finds journaled signals
+
+        Args:
+            symbol, interval, signal_type: Filters (None = any)
+            start: Earliest bar time (inclusive)
+            end: Latest bar time (exclusive)
+            limit: Return only the most recent records
+
+        Returns:
+            Matching records (RECORD_DTYPE) sorted by bar time
+        """
+        if not os.path.isdir(self.directory):
+            return np.zeros(0, dtype=RECORD_DTYPE)
+
+        strings = _load_strings(self.directory)
+        ids = {s: i for i, s in enumerate(strings)}
+        wanted = []
+        for value in (symbol, interval, signal_type):
+            if value is not None and value not in ids:
+                return np.zeros(0, dtype=RECORD_DTYPE)
+            wanted.append(None if value is None else ids[value])
+
+        start_ms = _time_ms(start) if start is not None else np.iinfo(np.int64).min
+        end_ms = _time_ms(end) if end is not None else np.iinfo(np.int64).max
+
+        records = self._records()
+        index = self._load_index()
+        indexed = len(index['positions']) if index is not None else 0
+
+        positions = []
+        if index is not None and indexed:
+            unique_keys = np.asarray(index['unique_keys'])
+            mask = np.ones(len(unique_keys), dtype=bool)
+            for shift, wanted_id in zip((32, 16, 0), wanted):
+                if wanted_id is not None:
+                    mask &= ((unique_keys >> np.uint64(shift)) & np.uint64(0xFFFF)) == wanted_id
+            keys, times = index['keys'], index['times']
+            for key in unique_keys[mask]:
+                lo = np.searchsorted(keys, key, 'left')
+                hi = np.searchsorted(keys, key, 'right')
+                group_times = times[lo:hi]
+                first = lo + np.searchsorted(group_times, start_ms, 'left')
+                last = lo + np.searchsorted(group_times, end_ms, 'left')
+                positions.append(np.asarray(index['positions'][first:last]))
+
+        # Records appended after the index was built
+        tail = records[indexed:]
+        if len(tail):
+            mask = (tail['time'] >= start_ms) & (tail['time'] < end_ms)
+            for field, wanted_id in zip(('symbol', 'interval', 'type'), wanted):
+                if wanted_id is not None:
+                    mask &= tail[field] == wanted_id
+            positions.append(indexed + np.flatnonzero(mask))
+
+        if not positions:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        result = np.asarray(records[np.sort(np.concatenate(positions))])
+        result = result[np.argsort(result['time'], kind='stable')]
+        if limit is not None:
+            result = result[-limit:]
+        return result
+
+    def decode(self, records: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Converts records into dictionaries with string fields resolved
+        """
+        strings = _load_strings(self.directory)
+        return [{
+            'time': datetime.fromtimestamp(r['time'] / 1000, tz=timezone.utc),
+            'symbol': strings[r['symbol']],
+            'interval': strings[r['interval']],
+            'type': strings[r['type']],
+            'strength': strings[r['strength']],
+            'price': float(r['price']),
+            'trigger': float(r['trigger']),
+            'band': float(r['band']),
+            'fisher': float(r['fisher']),
+        } for r in records]
+
+def _parse_date(value: str) -> datetime:
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query the signal journal")
+    parser.add_argument('--dir', default=config.JOURNAL_DIR, help="Journal directory")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    query_parser = subparsers.add_parser('query', help="Find signals")
+    query_parser.add_argument('--symbol')
+    query_parser.add_argument('--interval')
+    query_parser.add_argument('--type', dest='signal_type', help="e.g. EXTREME_SELL")
+    query_parser.add_argument('--since', type=_parse_date, help="UTC date/time, e.g. 2026-09-01")
+    query_parser.add_argument('--until', type=_parse_date, help="UTC date/time (exclusive)")
+    query_parser.add_argument('--limit', type=int)
+    query_parser.add_argument('--count', action='store_true', help="Only print the number of matches")
+
+    subparsers.add_parser('reindex', help="Rebuild the index")
+
+    args = parser.parse_args(argv)
+    reader = JournalReader(args.dir)
+
+    if args.command == 'reindex':
+        reader.build_index()
+        return 0
+
+    started = time.perf_counter()
+    records = reader.query(args.symbol, args.interval, args.signal_type, args.since, args.until, args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if not args.count:
+        for r in reader.decode(records):
+            print(f"{r['time']:%Y-%m-%d %H:%M} {r['symbol']} {r['interval']} {r['type']} "
+                  f"price={r['price']:g} trigger={r['trigger']:.4f} band={r['band']:.4f} fisher={r['fisher']:.4f}")
+    print(f"{len(records)} signals ({elapsed:.1f} ms)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, FrozenSet, Iterable, Optional
+
+import config
+
+# Log settings
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('subscriptions')
+
+# Matches any symbol, interval or signal type
+WILDCARD = "*"
+_FIELDS = ('symbols', 'intervals', 'types')
+
+class SubscriptionRegistry:
+    """
+    Chat subscriptions with an inverted index from (symbol, interval, type) to chat IDs
+
+    Subscriptions are stored in a JSON file:
+        {"subscribers": [{"chat_id": "123", "symbols": ["BTC-USDT"], "intervals": ["*"], "types": ["EXTREME_SELL"]}]}
+    Missing fields match everything. The file is reloaded when it changes on disk.
+    Without a file, config.TELEGRAM_CHAT_ID receives all signals.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = config.SUBSCRIPTIONS_FILE if path is None else path
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Dict[str, List[str]]] = {}
+        self._index: Dict[tuple, FrozenSet[str]] = {}
+        self._file_state = None
+        self._last_check = 0.0
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads subscriptions from disk and rebuilds the index
+        """
+        file_state = self._stat()
+        subscribers = {}
+        if file_state is None:
+            if config.TELEGRAM_CHAT_ID:
+                subscribers[str(config.TELEGRAM_CHAT_ID)] = {field: [WILDCARD] for field in _FIELDS}
+        else:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    data = json.load(f)
+                for item in data.get('subscribers', []):
+                    subscribers[str(item['chat_id'])] = {
+                        field: list(item.get(field) or [WILDCARD]) for field in _FIELDS
+                    }
+            except Exception as e:
+                # Keep serving the previous subscriptions
+                logger.error(f"Error loading subscriptions from {self.path}: {e}")
+                self._file_state = file_state
+                return
+
+        index = self._build_index(subscribers)
+        with self._lock:
+            self._subscribers = subscribers
+            self._index = index
+            self._file_state = file_state
+        logger.info(f"Subscriptions loaded: {len(subscribers)} chats, {len(index)} index keys")
+
+    def reload_if_changed(self) -> None:
+        """
+        Reloads the file if it changed, checking at most every SUBSCRIPTIONS_RELOAD_INTERVAL seconds
+        """
+        now = time.monotonic()
+        if now - self._last_check < config.SUBSCRIPTIONS_RELOAD_INTERVAL:
+            return
+        self._last_check = now
+        if self._stat() != self._file_state:
+            self.load()
+
+    def route(self, symbol: str, interval: str, signal_type: str) -> FrozenSet[str]:
+        """
+        Returns the chat IDs subscribed to a signal
+        """
+        index = self._index
+        chats = None
+        for key in itertools.product((symbol, WILDCARD), (interval, WILDCARD), (signal_type, WILDCARD)):
+            matched = index.get(key)
+            if matched:
+                chats = matched if chats is None else chats | matched
+        return chats or frozenset()
+
+    def subscribe(self, chat_id: str, symbols: Iterable[str] = None, intervals: Iterable[str] = None,
+                  types: Iterable[str] = None) -> None:
+        """
+        Adds or replaces a chat's subscription and saves the registry
+        """
+        with self._lock:
+            subscribers = dict(self._subscribers)
+        subscribers[str(chat_id)] = {
+            'symbols': list(symbols or [WILDCARD]),
+            'intervals': list(intervals or [WILDCARD]),
+            'types': list(types or [WILDCARD]),
+        }
+        self._replace(subscribers)
+
+    def unsubscribe(self, chat_id: str) -> bool:
+        """
+        Removes a chat's subscription and saves the registry
+
+        Returns:
+            True if the chat was subscribed
+        """
+        with self._lock:
+            subscribers = dict(self._subscribers)
+        if subscribers.pop(str(chat_id), None) is None:
+            return False
+        self._replace(subscribers)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def _replace(self, subscribers: Dict[str, Dict[str, List[str]]]) -> None:
+        self._save(subscribers)
+        index = self._build_index(subscribers)
+        with self._lock:
+            self._subscribers = subscribers
+            self._index = index
+            self._file_state = self._stat()
+
+    def _save(self, subscribers: Dict[str, Dict[str, List[str]]]) -> None:
+        data = {'subscribers': [{'chat_id': chat_id, **fields} for chat_id, fields in subscribers.items()]}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        # Write to a temporary file first so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _build_index(subscribers: Dict[str, Dict[str, List[str]]]) -> Dict[tuple, FrozenSet[str]]:
+        index: Dict[tuple, set] = {}
+        for chat_id, fields in subscribers.items():
+            for key in itertools.product(fields['symbols'], fields['intervals'], fields['types']):
+                index.setdefault(key, set()).add(chat_id)
+        return {key: frozenset(chats) for key, chats in index.items()}
+
+# Shared registry
+registry = SubscriptionRegistry()
+
+def _benchmark(subscribers: int, signals: int, symbols: int) -> None:
+    from telegram_sender import plan_digest, fan_out
+
+    rng = random.Random(42)
+    universe = [f"COIN{i}-USDT" for i in range(symbols)]
+    intervals = ['5m', '15m', '30m', '1H']
+    types = ['EXTREME_BUY', 'EXTREME_SELL']
+
+    with tempfile.TemporaryDirectory() as directory:
+        bench_registry = SubscriptionRegistry(os.path.join(directory, 'subscriptions.json'))
+        data = {'subscribers': [{
+            'chat_id': str(100000 + i),
+            'symbols': rng.sample(universe, rng.randint(1, 20)) if rng.random() < 0.8 else [WILDCARD],
+            'intervals': rng.sample(intervals, rng.randint(1, 4)),
+            'types': rng.sample(types, rng.randint(1, 2)),
+        } for i in range(subscribers)]}
+        with open(bench_registry.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        started = time.perf_counter()
+        bench_registry.load()
+        load_time = time.perf_counter() - started
+
+        entries = [({
+            'type': rng.choice(types), 'strength': 'WARNING', 'price': rng.uniform(1, 1000),
+            'trigger': rng.uniform(-3, 3), 'band': rng.uniform(-3, 3), 'fisher': rng.uniform(-3, 3),
+            'description': 'Benchmark signal',
+        }, rng.choice(universe), rng.choice(intervals)) for _ in range(signals)]
+
+        started = time.perf_counter()
+        plan = plan_digest(entries, route=bench_registry.route)
+        plan_time = time.perf_counter() - started
+
+        deliveries = [(chat_id, messages) for chat_ids, messages in plan for chat_id in chat_ids]
+        sent = []
+        started = time.perf_counter()
+        failed = fan_out(deliveries, send=lambda chat_id, text: sent.append(chat_id), rate_limit=0, chat_interval=0)
+        fan_out_time = time.perf_counter() - started
+
+    print(f"Subscribers: {subscribers}, signals: {signals}, symbols: {symbols}")
+    print(f"Load + index: {load_time * 1000:.1f} ms")
+    print(f"Route + render: {plan_time * 1000:.1f} ms ({len(plan)} distinct digests for {len(deliveries)} chats)")
+    print(f"Fan-out (mock send): {fan_out_time * 1000:.1f} ms ({len(sent)} messages, {failed} failed)")
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage signal subscriptions")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add_parser = subparsers.add_parser('add', help="Add or replace a chat's subscription")
+    add_parser.add_argument('chat_id')
+    add_parser.add_argument('--symbols', help="Comma separated, default all")
+    add_parser.add_argument('--intervals', help="Comma separated, default all")
+    add_parser.add_argument('--types', help="Comma separated, default all")
+
+    remove_parser = subparsers.add_parser('remove', help="Remove a chat's subscription")
+    remove_parser.add_argument('chat_id')
+
+    bench_parser = subparsers.add_parser('bench', help="Benchmark routing to mock subscribers")
+    bench_parser.add_argument('--subscribers', type=int, default=10000)
+    bench_parser.add_argument('--signals', type=int, default=50)
+    bench_parser.add_argument('--symbols', type=int, default=300)
+
+    args = parser.parse_args(argv)
+    split = lambda value: value.split(',') if value else None
+
+    if args.command == 'add':
+        registry.subscribe(args.chat_id, split(args.symbols), split(args.intervals), split(args.types))
+    elif args.command == 'remove':
+        if not registry.unsubscribe(args.chat_id):
+            print(f"Chat {args.chat_id} is not subscribed", file=sys.stderr)
+            return 1
+    elif args.command == 'bench':
+        _benchmark(args.subscribers, args.signals, args.symbols)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
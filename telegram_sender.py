@@ -1,8 +1,16 @@
 import telegram
+from telegram.error import BadRequest, RetryAfter
+from telegram.utils.request import Request
 import logging
-from typing import Dict, Any, List
+import heapq
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Dict, Any, List, Tuple, Callable
 import config
 from datetime import datetime
+from subscriptions import registry
 
 # Log settings
 logging.basicConfig(
@@ -12,8 +20,12 @@ logging.basicConfig(
 logger = logging.getLogger('telegram_sender')
 
 # Create Telegram bot instance
+# The connection pool must cover every sender thread plus scans and error notifications
 try:
-    bot = telegram.Bot(token=config.TELEGRAM_BOT_TOKEN)
+    bot = telegram.Bot(
+        token=config.TELEGRAM_BOT_TOKEN,
+        request=Request(con_pool_size=config.TELEGRAM_MAX_WORKERS + 4)
+    )
     logger.info("Telegram bot created successfully")
 except Exception as e:
     logger.error(f"Error creating Telegram bot: {e}")
@@ -148,6 +160,442 @@ def send_signals(signals: List[Dict[str, Any]], symbol: str, interval: str) -> b
         logger.error(f"Telegram message sending error: {e}")
         return False
 
+# Telegram rejects messages longer than 4096 UTF-16 code units
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+# Digest templates (compiled once at import, reused for every scan)
+_DIGEST_TITLES = {
+    'EXTREME_BUY': ("🔴", "EXTREME BUY ZONE"),
+    'EXTREME_SELL': ("🟢", "EXTREME SELL ZONE"),
+    'BUY': ("🟢", "BUY SIGNAL"),
+    'SELL': ("🔴", "SELL SIGNAL"),
+}
+_DIGEST_HEADER = "📊 SIGNAL DIGEST ({count} signals){part}\n".format
+_DIGEST_GROUP = "\n{emoji} {title} · {interval}\n".format
+_DIGEST_LINE = "{symbol}: {price} USDT | Trigger {trigger} | Band {band} | Fisher {fisher}\n".format
+
+def _telegram_length(text: str) -> int:
+    """
+    Returns message length as counted by Telegram (UTF-16 code units)
+    """
+    return len(text.encode('utf-16-le')) // 2
+
+def _format_number(value: Any, precision: int = 4) -> str:
+    if isinstance(value, (int, float)):
+        return f"{value:.{precision}f}"
+    return str(value) if value is not None else "-"
+
+def format_digest_line(signal: Dict[str, Any], symbol: str) -> str:
+    """
+    Formats a single signal as one compact digest line
+    """
+    price = signal.get('price')
+    if isinstance(price, (int, float)):
+        price_str = f"{price:.2f}" if price < 100 else f"{price:.1f}"
+    else:
+        price_str = _format_number(price)
+
+    return _DIGEST_LINE(
+        symbol=symbol,
+        price=price_str,
+        trigger=_format_number(signal.get('trigger')),
+        band=_format_number(signal.get('band')),
+        fisher=_format_number(signal.get('fisher'))
+    )
+
+def format_digest_messages(entries: List[Tuple[Dict[str, Any], str, str]], lines: List[str] = None) -> List[str]:
+    """
+    Renders the signals of one scan into as few messages as the Telegram size limit allows
+    
+    Args:
+        entries: List of (signal, symbol, interval) tuples
+        lines: Digest lines already rendered for the entries (optional)
+        
+    Returns:
+        List of message texts, grouped by interval and signal type
+    """
+    if not entries:
+        return []
+    
+    # A single signal keeps the detailed format
+    if len(entries) == 1:
+        signal, symbol, interval = entries[0]
+        return [format_signal_message(signal, symbol, interval)]
+    
+    # Group by interval and type, keeping the scan order
+    groups: Dict[Tuple[str, str], List[str]] = {}
+    for i, (signal, symbol, interval) in enumerate(entries):
+        line = lines[i] if lines is not None else format_digest_line(signal, symbol)
+        groups.setdefault((interval, signal['type']), []).append(line)
+    
+    # Reserve room for the header, which is only known once the parts are counted
+    header_room = _telegram_length(_DIGEST_HEADER(count=len(entries), part=" (99/99)"))
+    limit = TELEGRAM_MAX_MESSAGE_LENGTH - header_room
+    
+    bodies = []
+    body = ""
+    for (interval, signal_type), lines in groups.items():
+        emoji, title = _DIGEST_TITLES.get(signal_type, ("⚠️", signal_type))
+        group_header = _DIGEST_GROUP(emoji=emoji, title=title, interval=interval)
+        in_body = False
+        for line in lines:
+            chunk = line if in_body else group_header + line
+            if body and _telegram_length(body) + _telegram_length(chunk) > limit:
+                # Start a new message, repeating the group header
+                bodies.append(body)
+                body = ""
+                chunk = group_header + line
+            body += chunk
+            in_body = True
+    if body:
+        bodies.append(body)
+    
+    messages = []
+    for i, body in enumerate(bodies, start=1):
+        part = f" ({i}/{len(bodies)})" if len(bodies) > 1 else ""
+        messages.append(_DIGEST_HEADER(count=len(entries), part=part) + body)
+    return messages
+
+class SignalDigest:
+    """
+    Collects the signals of one scan and sends them as a batched digest
+    
+    Signals are sent when flush() is called at the end of the scan, or earlier
+    when the oldest pending signal has waited max_wait seconds.
+    """
+    
+    def __init__(self, max_wait: float = None):
+        self.max_wait = config.DIGEST_MAX_WAIT if max_wait is None else max_wait
+        self._entries: List[Tuple[Dict[str, Any], str, str]] = []
+        self._lock = threading.Lock()
+        self._timer = None
+    
+    def add(self, signal: Dict[str, Any], symbol: str, interval: str) -> None:
+        """
+        Adds a signal to the pending digest
+        """
+        with self._lock:
+            self._entries.append((signal, symbol, interval))
+            if self._timer is None and self.max_wait > 0:
+                self._timer = threading.Timer(self.max_wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def flush(self) -> bool:
+        """
+        Hands all pending signals to the sender threads without waiting for delivery
+        
+        Returns:
+            True if the digest is queued (or nothing is pending), False otherwise
+        """
+        with self._lock:
+            entries, self._entries = self._entries, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        
+        if not entries:
+            return True
+        return send_digest(entries)
+
+class _RateLimiter:
+    """
+    Spaces out calls to stay under a global rate (calls per second, 0 = unlimited)
+    """
+    
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next = 0.0
+    
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            if self.rate > 0:
+                self._next = slot + 1 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+    
+    def pause(self, seconds: float) -> None:
+        """
+        Holds back every call for at least the given seconds (e.g., after Telegram's RetryAfter)
+        """
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+# Shared by every sender, so concurrent scans together stay within Telegram's limits
+_send_limiter = _RateLimiter(config.TELEGRAM_RATE_LIMIT)
+
+def plan_digest(entries: List[Tuple[Dict[str, Any], str, str]],
+                route: Callable[[str, str, str], Any] = None) -> List[Tuple[List[str], List[str]]]:
+    """
+    Routes signals to subscribed chats and renders each distinct digest once
+    
+    Every signal line is rendered once, and chats receiving the same set of signals
+    share the same rendered messages.
+    
+    Args:
+        entries: List of (signal, symbol, interval) tuples
+        route: Function returning chat IDs for (symbol, interval, type) (default: registry.route)
+        
+    Returns:
+        List of (chat IDs, messages) tuples
+    """
+    route = registry.route if route is None else route
+    lines = [format_digest_line(signal, symbol) for signal, symbol, interval in entries]
+    
+    chat_entries = defaultdict(list)
+    for i, (signal, symbol, interval) in enumerate(entries):
+        for chat_id in route(symbol, interval, signal['type']):
+            chat_entries[chat_id].append(i)
+    
+    recipients = defaultdict(list)
+    for chat_id, indexes in chat_entries.items():
+        recipients[tuple(indexes)].append(chat_id)
+    
+    return [
+        (chat_ids, format_digest_messages([entries[i] for i in indexes], [lines[i] for i in indexes]))
+        for indexes, chat_ids in recipients.items()
+    ]
+
+def _send_to_chat(chat_id: str, text: str, markdown: bool = True) -> None:
+    bot.send_message(chat_id=chat_id, text=text, parse_mode=telegram.ParseMode.MARKDOWN if markdown else None)
+
+def _deliver(chat_id: str, message: str, send: Callable[..., Any], limiter: _RateLimiter) -> bool:
+    markdown = True
+    retried = False
+    while True:
+        # Every attempt, including retries, counts against the global rate
+        limiter.wait()
+        try:
+            if markdown:
+                send(chat_id, message)
+            else:
+                send(chat_id, message, markdown=False)
+            return True
+        except RetryAfter as e:
+            if retried:
+                logger.error(f"Signal digest sending error (chat {chat_id}): {e}")
+                return False
+            retried = True
+            # The limit is per bot, so every sender waits before the retry
+            logger.warning(f"Telegram rate limit hit, pausing all sends for {e.retry_after}s")
+            limiter.pause(e.retry_after)
+        except BadRequest as e:
+            if not markdown:
+                logger.error(f"Signal digest sending error (chat {chat_id}): {e}")
+                return False
+            # Retry without formatting
+            logger.warning(f"Markdown rejected for chat {chat_id}, sending plain text: {e}")
+            markdown = False
+        except Exception as e:
+            logger.error(f"Signal digest sending error (chat {chat_id}): {e}")
+            return False
+
+class _DeliveryPool:
+    """
+    Long-lived worker threads delivering queued messages, one pending queue per chat
+    
+    Chats are served in the order their next message is allowed (chat_interval apart),
+    so workers never sleep on one chat while another one is ready. A chat keeps at most
+    max_pending messages (0 = unlimited); when newer digests arrive for a chat that is
+    still behind, its oldest messages are dropped.
+    """
+    
+    def __init__(self, workers: int, send: Callable[..., Any], limiter: _RateLimiter,
+                 chat_interval: float, max_pending: int):
+        self.workers = workers
+        self.send = send
+        self.limiter = limiter
+        self.chat_interval = chat_interval
+        self.max_pending = max_pending
+        self.failed = 0
+        self.dropped = 0
+        self._cond = threading.Condition()
+        # Pending messages per chat, kept while a message of the chat is being sent
+        self._pending: Dict[str, deque] = {}
+        # (allowed time, sequence, chat ID) of chats waiting for a worker
+        self._ready: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._next: Dict[str, float] = {}
+        self._closing = False
+        self._threads: List[threading.Thread] = []
+    
+    def submit(self, deliveries: List[Tuple[str, List[str]]]) -> None:
+        """
+        Queues deliveries and returns without waiting for them
+        """
+        with self._cond:
+            if not self._threads:
+                self._closing = False
+                for n in range(self.workers):
+                    thread = threading.Thread(target=self._run, name=f'telegram-sender-{n}', daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+            
+            now = time.monotonic()
+            for chat_id, messages in deliveries:
+                pending = self._pending.get(chat_id)
+                if pending is None:
+                    pending = self._pending[chat_id] = deque()
+                    heapq.heappush(self._ready, (max(now, self._next.get(chat_id, 0.0)), next(self._sequence), chat_id))
+                pending.extend(messages)
+                if self.max_pending and len(pending) > self.max_pending:
+                    dropped = len(pending) - self.max_pending
+                    for _ in range(dropped):
+                        pending.popleft()
+                    self.dropped += dropped
+                    logger.warning(f"Chat {chat_id} is falling behind, dropped its {dropped} oldest digest messages")
+            self._cond.notify_all()
+    
+    def pending(self) -> int:
+        """
+        Returns the number of messages waiting to be sent
+        """
+        with self._cond:
+            return sum(len(messages) for messages in self._pending.values())
+    
+    def join(self, timeout: float = None) -> bool:
+        """
+        Waits until all queued messages are sent
+        
+        Returns:
+            True if nothing is pending, False if the timeout expired first
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending, timeout)
+    
+    def close(self) -> int:
+        """
+        Stops the workers, dropping the messages that are still pending
+        
+        Returns:
+            Number of dropped messages
+        """
+        with self._cond:
+            threads, self._threads = self._threads, []
+            dropped = sum(len(messages) for messages in self._pending.values())
+            self._pending.clear()
+            self._ready.clear()
+            self._closing = True
+            self._cond.notify_all()
+        for thread in threads:
+            thread.join()
+        return dropped
+    
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._closing:
+                        return
+                    if not self._ready:
+                        self._cond.wait()
+                        continue
+                    allowed, _, chat_id = self._ready[0]
+                    delay = allowed - time.monotonic()
+                    if delay <= 0:
+                        heapq.heappop(self._ready)
+                        break
+                    self._cond.wait(delay)
+                message = self._pending[chat_id].popleft()
+            
+            try:
+                delivered = _deliver(chat_id, message, self.send, self.limiter)
+            except Exception as e:
+                logger.error(f"Signal digest delivery error: {e}")
+                delivered = False
+            
+            with self._cond:
+                if not delivered:
+                    self.failed += 1
+                now = time.monotonic()
+                if self.chat_interval > 0:
+                    # Telegram allows about one message per second to the same chat
+                    self._next[chat_id] = now + self.chat_interval
+                    # Forget chats whose interval has passed
+                    if len(self._next) > 10000:
+                        self._next = {chat: t for chat, t in self._next.items() if t > now}
+                pending = self._pending.get(chat_id)
+                if pending:
+                    heapq.heappush(self._ready, (self._next.get(chat_id, now), next(self._sequence), chat_id))
+                elif pending is not None:
+                    del self._pending[chat_id]
+                self._cond.notify_all()
+
+# Shared sender used by send_digest, so scans never wait on Telegram
+_delivery_pool = _DeliveryPool(config.TELEGRAM_MAX_WORKERS, _send_to_chat, _send_limiter,
+                               config.TELEGRAM_CHAT_INTERVAL, config.TELEGRAM_MAX_PENDING_MESSAGES)
+
+def fan_out(deliveries: List[Tuple[str, List[str]]], send: Callable[..., Any] = None,
+            rate_limit: float = None, chat_interval: float = None) -> int:
+    """
+    Sends messages to many chats in parallel within Telegram's rate limits and waits for completion
+    
+    Args:
+        deliveries: List of (chat ID, messages) tuples
+        send: Function sending one message to a chat, called with markdown=False to resend
+            plain text when Telegram rejects the formatting (default: Telegram bot)
+        rate_limit: Maximum messages per second over all chats (default: shared TELEGRAM_RATE_LIMIT limiter)
+        chat_interval: Seconds between messages to the same chat (default: TELEGRAM_CHAT_INTERVAL)
+        
+    Returns:
+        Number of messages that could not be sent
+    """
+    if not deliveries:
+        return 0
+    
+    pool = _DeliveryPool(
+        min(config.TELEGRAM_MAX_WORKERS, len(deliveries)),
+        _send_to_chat if send is None else send,
+        _send_limiter if rate_limit is None else _RateLimiter(rate_limit),
+        config.TELEGRAM_CHAT_INTERVAL if chat_interval is None else chat_interval,
+        0
+    )
+    pool.submit(deliveries)
+    pool.join()
+    pool.close()
+    return pool.failed
+
+def close_sender(timeout: float = None) -> None:
+    """
+    Waits for queued digests to be sent, then stops the sender threads
+    
+    Args:
+        timeout: Maximum seconds to wait (default: config.TELEGRAM_SHUTDOWN_TIMEOUT)
+    """
+    timeout = config.TELEGRAM_SHUTDOWN_TIMEOUT if timeout is None else timeout
+    if not _delivery_pool.join(timeout):
+        logger.warning(f"Signal digests still pending after {timeout}s")
+    dropped = _delivery_pool.close()
+    if dropped:
+        logger.warning(f"Sender stopped, {dropped} digest messages were not sent")
+
+def send_digest(entries: List[Tuple[Dict[str, Any], str, str]]) -> bool:
+    """
+    Queues a batch of signals as digest messages for the subscribed chats
+    
+    Delivery runs on the shared sender threads; failures are logged there.
+    
+    Args:
+        entries: List of (signal, symbol, interval) tuples
+        
+    Returns:
+        True if the digest is queued, False otherwise
+    """
+    if not bot:
+        logger.error("Telegram bot not created - Signal digest not sent!")
+        return False
+    
+    registry.reload_if_changed()
+    plan = plan_digest(entries)
+    deliveries = [(chat_id, messages) for chat_ids, messages in plan for chat_id in chat_ids]
+    _delivery_pool.submit(deliveries)
+    
+    logger.info(f"Signal digest queued: {len(entries)} signals for {len(deliveries)} chats ({_delivery_pool.pending()} messages pending)")
+    return True
+
 def send_simple_message(text: str) -> bool:
     """
     Sends a simple message - For test and notifications